@@ -25,25 +25,27 @@ If a file already exists for another user, skip it.
 (Answer: again, the API should not care about the underlying storage, e.g. storage format, how the content is stored on disk etc.)
 """
 
+import heapq
 from collections import defaultdict
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True)
 class File:
     file_name: str
     file_size: int
     
-    def __lt__(self, other: 'File'):
-        return (self.file_size > other.file_size) or (self.file_size == other.file_size and self.file_name < other.file_name)
-    
 # external: database, service, etc.
 BACKUP = {}
 
+_EMPTY: frozenset[str] = frozenset()
+
 class FileManager:
     def __init__(self):
-        self.__files_by_id = defaultdict(int) # <file_name> - file_size in bytes
-        self.__user_cap = defaultdict(int)
+        self.__files_by_id: dict[str, int] = dict() # <file_name> - file_size in bytes
+        self.__user_cap: dict[str, float] = dict()
         self.__files_by_user = defaultdict(set)
+        self.__owner_by_file = dict() # <file_name> - user_name
+        self.__used_by_user = defaultdict(int) # <user_name> - total file_size in bytes
         self.__user_cap['admin'] = float('inf')
         
     def __str__(self) -> str:
@@ -70,23 +72,22 @@ class FileManager:
             -1 otherwise
         """
         
-        if file_name not in self.__files_by_id:
+        file_size = self.__files_by_id.pop(file_name, None)
+        if file_size is None:
             return -1
         
-        file_size = self.__files_by_id[file_name]
-        for user, files in self.__files_by_user.items():
-            if file_name in files:
-                files.remove(file_name)
+        owner = self.__owner_by_file.pop(file_name, None)
+        if owner is not None:
+            self.__files_by_user[owner].discard(file_name)
+            self.__used_by_user[owner] -= file_size
         
-        del self.__files_by_id[file_name]
         return file_size
     
     # Part 2: File utility
     def list_n_files_by_default_order(self, top_n: int) -> list[File]:
-        if top_n > len(self.__files_by_id):
-            top_n = len(self.__files_by_id)
-        sorted_files = sorted([File(k, v) for k, v in self.__files_by_id.items()])
-        return sorted_files[:top_n]
+        # partial sort: O(F log n) over raw (name, size) items, only top_n become File
+        top = heapq.nsmallest(top_n, self.__files_by_id.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [File(file_name, file_size) for file_name, file_size in top]
     
     # Part 3: User
     def add_user(self, user_name: str, user_cap: int) -> int:
@@ -100,38 +101,45 @@ class FileManager:
         if user_name not in self.__user_cap:
             return -1
         user_cap = self.__user_cap[user_name]
-        files_by_user = self._get_file_by_user(user_name)
-        total_used = sum(self.__files_by_id[f] for f in files_by_user)
         
-        if total_used + file_size > user_cap:
+        if self.__used_by_user[user_name] + file_size > user_cap:
             return -1
         
         result =  self.create_file(file_name, file_size, user_name)
         if result != -1:
             self.__files_by_user[user_name].add(file_name)
+            self.__owner_by_file[file_name] = user_name
+            self.__used_by_user[user_name] += file_size
         return result
         
     
-    def _get_file_by_user(self, user_name: str) -> int:
-        return self.__files_by_user.get(user_name, {})
+    def _get_file_by_user(self, user_name: str) -> set[str] | frozenset[str]:
+        # read-only view, mutate through self.__files_by_user[user_name]
+        return self.__files_by_user.get(user_name, _EMPTY)
     
     def merge_users(self, to_user: str, from_user) -> int:
         if to_user not in self.__user_cap or from_user not in self.__user_cap:
             print('Ensure both users exists')
             return -1
         
-        self.__user_cap[to_user] += self.__user_cap[from_user]
-        del self.__user_cap[from_user]
-        self.__files_by_user[to_user] = self.__files_by_user[to_user].union(self.__files_by_user[from_user])
-        del self.__files_by_user[from_user]
+        if to_user == from_user:
+            print('Cannot merge a user into itself')
+            return -1
+        
+        self.__user_cap[to_user] += self.__user_cap.pop(from_user)
+        from_files = self.__files_by_user.pop(from_user, set())
+        for file_name in from_files:
+            self.__owner_by_file[file_name] = to_user
+        self.__files_by_user[to_user].update(from_files)
+        self.__used_by_user[to_user] += self.__used_by_user.pop(from_user, 0)
         
         return self.__user_cap[to_user]
     
     # Part 4: Backup and restore
     def backup(self, user_name: str) -> int:
         files_by_user = self._get_file_by_user(user_name) # 1 snapshot
-        BACKUP[user_name] = [File(file_name, self.__files_by_id[file_name]) for file_name in files_by_user]
-        return sum(f.file_size for f in BACKUP[user_name])
+        BACKUP[user_name] = {file_name: self.__files_by_id[file_name] for file_name in files_by_user}
+        return sum(BACKUP[user_name].values())
     
     def restore(self, user_name: str) -> int:
         if user_name not in BACKUP:
@@ -140,29 +148,26 @@ class FileManager:
         if user_name not in self.__user_cap:
             self.add_user(user_name)
         
-        snapshot: list[File] = BACKUP[user_name]
+        snapshot: dict[str, int] = BACKUP[user_name] # <file_name> - file_size
         print(f'backed up snapshot: {snapshot}')
         
-        file_owner = dict()
-        for user, file_set in self.__files_by_user.items():
-            for file_name in file_set:
-                file_owner[file_name] = user
-        
         current_set = self.__files_by_user[user_name]
-        to_delete = current_set.difference(set([file.file_name for file in snapshot]))
+        to_delete = current_set - snapshot.keys()
         print(f'to delete: {to_delete}')
         
-        for file in snapshot:
-            if file_owner.get(file.file_name, user_name) != user_name:
-                continue
-            current_set.add(file.file_name)
-            self.__files_by_id[file.file_name] = file.file_size
+        # skip files owned by another user, override the rest in one batch
+        allowed = {file_name for file_name in snapshot if self.__owner_by_file.get(file_name, user_name) == user_name}
+        self.__files_by_id.update({file_name: snapshot[file_name] for file_name in allowed})
+        self.__owner_by_file.update(dict.fromkeys(allowed, user_name))
+        current_set -= to_delete
+        current_set |= allowed
         
         for file_name in to_delete:
-            current_set.remove(file_name)
-            del self.__files_by_id[file_name]
+            self.__files_by_id.pop(file_name, None)
+            self.__owner_by_file.pop(file_name, None)
             
-        return sum(self.__files_by_id[file_name] for file_name in current_set)  
+        self.__used_by_user[user_name] = sum(self.__files_by_id[file_name] for file_name in current_set)
+        return self.__used_by_user[user_name]
     
 if __name__ == '__main__':
     file_manager = FileManager()
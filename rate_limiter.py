@@ -40,6 +40,7 @@ If the request count exceeds the threshold, all the excess requests should be bl
 """
 
 import time
+import logging
 import threading
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
@@ -47,18 +48,25 @@ from collections import deque
 from typing import Any, Callable
 
 
-@dataclass
+@dataclass(slots=True)
 class Request:
     user_id: str
     req_id: int
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     used: float
     last_used_at: float
     
 
-dead_letter_queue = deque()
+log = logging.getLogger(__name__)
+
+DEAD_LETTER_QUEUE_MAXLEN = 10_000
+
+# bounded: oldest rejected requests are dropped once full
+dead_letter_queue = deque(maxlen=DEAD_LETTER_QUEUE_MAXLEN)
+
+LOCK_SHARDS = 64 # must be a power of 2
 
 class RateLimiter(ABC):
     # Public API
@@ -83,7 +91,8 @@ class TokenBucket(RateLimiter):
         self.capacity = capacity
         self.key_func = key_func
         self.__bucket = dict()
-        self.lock = threading.Lock()
+        # lock striping: keys on different shards don't contend with each other
+        self.__locks = [threading.Lock() for _ in range(LOCK_SHARDS)]
     
     # Public API
     def update_fill_rate(self, fill_rate: bool) -> None:
@@ -93,32 +102,37 @@ class TokenBucket(RateLimiter):
     def update_capacity(self, capacity: int) -> None:
         self.capacity = capacity
     
+    # Internal
+    def _lock(self, key: Any) -> threading.Lock:
+        return self.__locks[hash(key) & (LOCK_SHARDS - 1)]
+    
     # Internal
     def is_request_allowed(self, request: Request) -> tuple[bool, str]:
         key = self.key_func(request)
-        time_now = time.time()
+        time_now = time.monotonic()
         
-        with self.lock:
-            if key not in self.__bucket:
-                self.__bucket[key] = Token(used=0, last_used_at=time_now)
-            
-            last_successful_token: Token = self.__bucket[key]
+        with self._lock(key):
+            # get + miss branch: one probe and no Token allocation for keys already seen
+            last_successful_token: Token | None = self.__bucket.get(key)
+            if last_successful_token is None:
+                last_successful_token = self.__bucket[key] = Token(used=0, last_used_at=time_now)
             elapsed = (time_now - last_successful_token.last_used_at)
-            # LOG
-            print(f'Elapsed time: {elapsed}')
+            log.debug('Elapsed time: %s', elapsed)
             refill = self.fill_rate * elapsed
             new_token = min(self.capacity, last_successful_token.used + refill)
-            print(f'Current tokens: {new_token}')
+            log.debug('Current tokens: %s', new_token)
             allowed = new_token > 1
             
-            if not allowed:
-                dead_letter_queue.append(request)
-                return False, "Rate limit exceed"
-                
-            new_token -= 1
-            self.__bucket[key] = Token(new_token, time_now)
-                
-            return True, "Allowed"
+            if allowed:
+                last_successful_token.used = new_token - 1
+                last_successful_token.last_used_at = time_now
+        
+        if not allowed:
+            # deque.append is thread-safe, no need to hold the bucket lock
+            dead_letter_queue.append(request)
+            return False, "Rate limit exceed"
+            
+        return True, "Allowed"
     
 def simulate_user(rate_limiter: RateLimiter, user_id: str, num_requests: int):
     for i in range(num_requests):
@@ -1,7 +1,20 @@
 from dataclasses import dataclass
-from collections import defaultdict
 
-@dataclass
+# cell encoding for the flat board storage
+EMPTY = 0
+SIGN_TO_CODE = {'.': EMPTY, 'X': 1, 'O': 2}
+CODE_TO_SIGN = '.XO'
+DISPLAY_TABLE = bytes.maketrans(bytes(range(len(CODE_TO_SIGN))), CODE_TO_SIGN.encode())
+
+WIN_LENGTH = 5
+DIRECTIONS = (
+    (1, 0), # vertical
+    (0, 1), # horizontal
+    (1, 1), # diagonal
+    (1, -1), # anti-diagonal
+)
+
+@dataclass(slots=True)
 class Player:
     name: str
     sign: str
@@ -12,52 +25,73 @@ class Board:
             raise ValueError("Board size must be between 1 and 20")
         
         self.__size = size
-        self.__id_to_sign = defaultdict(str)
+        self.__cells_total = size * size
+        self.__cells = bytearray(self.__cells_total) # <cell_id> - sign code
+        self.__lines = [self.__build_lines(cell_id) for cell_id in range(self.__cells_total)]
     
     def get_size(self) -> int:
         return self.__size
     
+    def get_total_cells(self) -> int:
+        return self.__cells_total
+    
+    def __build_lines(self, cell_id: int) -> list[tuple[tuple[int, ...], tuple[int, ...]]]:
+        """
+        Returns
+            for each direction, the (backward, forward) cell ids within WIN_LENGTH - 1 steps of cell_id,
+            ordered outwards from cell_id and clipped to the board
+        """
+        row, col = divmod(cell_id, self.__size)
+        lines = []
+        for dr, dc in DIRECTIONS:
+            halves = []
+            for step in (-1, 1):
+                ids = []
+                for k in range(1, WIN_LENGTH):
+                    nr, nc = row + step * k * dr, col + step * k * dc
+                    if not (0 <= nr < self.__size and 0 <= nc < self.__size):
+                        break
+                    ids.append(self.__get_id(nr, nc))
+                halves.append(tuple(ids))
+            lines.append(tuple(halves))
+        return lines
+    
     def __get_id(self, row: int, col: int) -> int:
         return col + row * self.__size
     
     def display(self):
-        for row in range(self.__size):
-            line = []
-            for col in range(self.__size):
-                sign = self.__id_to_sign.get(self.__get_id(row, col), '.')
-                line.append(sign)
+        for start in range(0, self.__cells_total, self.__size):
+            line = self.__cells[start:start + self.__size].translate(DISPLAY_TABLE).decode()
             print(" ".join(line))
             
     def place(self, row: int, col: int, sign: str) -> bool:
-        if not self.__is_valid(row, col, '.'):
+        code = SIGN_TO_CODE.get(sign, EMPTY)
+        if code == EMPTY or not self.__is_valid(row, col, EMPTY):
             return False
         
-        self.__id_to_sign[self.__get_id(row, col)] = sign
+        self.__cells[self.__get_id(row, col)] = code
         return True
     
-    def check_winner(self, sign: str) -> bool:
-        def count_consecutive(dr, dc):
-            for r in range(self.__size):
-                for c in range(self.__size):
-                    count = 0
-                    for k in range(5):
-                        nr, nc = r + k * dr, c + k * dc
-                        if not self.__is_valid(nr, nc, sign):
-                            break
-                        count += 1
-                    if count == 5:
-                        return True
+    def check_winner(self, row: int, col: int, sign: str) -> bool:
+        # only lines through the last placed cell (row, col) can become a winning line
+        code = SIGN_TO_CODE.get(sign, EMPTY)
+        if code == EMPTY or not self.__is_valid(row, col, code):
             return False
         
-        return (
-            count_consecutive(1, 0) or # vertical
-            count_consecutive(0, 1) or # horizontal
-            count_consecutive(1, 1) or # diagonal
-            count_consecutive(1, -1) # anti-diagonal
-        )
+        cells = self.__cells
+        for backward, forward in self.__lines[self.__get_id(row, col)]:
+            count = 1
+            for ids in (backward, forward):
+                for cell_id in ids:
+                    if cells[cell_id] != code:
+                        break
+                    count += 1
+            if count >= WIN_LENGTH:
+                return True
+        return False
     
-    def __is_valid(self, row: int, col: int, sign: str) -> bool:
-        return 0 <= row < self.__size and 0 <= col < self.__size and self.__id_to_sign.get(self.__get_id(row, col), ".") == sign
+    def __is_valid(self, row: int, col: int, code: int) -> bool:
+        return 0 <= row < self.__size and 0 <= col < self.__size and self.__cells[self.__get_id(row, col)] == code
 
 class Game:
     def __init__(self, size: int):
@@ -74,7 +108,7 @@ class Game:
     def play(self):
         self.__board.display()
         move_cnt = 0
-        max_moves = self.__board.get_size() * self.__board.get_size()
+        max_moves = self.__board.get_total_cells()
         x = y = -1
         
         while move_cnt < max_moves:
@@ -91,7 +125,7 @@ class Game:
                 self.__board.display()
                 move_cnt += 1
                 
-                if self.__board.check_winner(player.sign):
+                if self.__board.check_winner(x, y, player.sign):
                     print(f"{player.name} wins")
                     return
                 self.__switch_player()